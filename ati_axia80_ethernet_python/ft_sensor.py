@@ -1,88 +1,64 @@
 import socket
+import selectors
 import struct
 import requests
 import xml.etree.ElementTree as ET
+import threading
+import os
+import sys
 import time
-import multiprocessing
-
-def read_loop(sensor_ip, sensor_port, calpf, calpt, force_torque_data, data_lock, stop_event):
-    """
-    Thread loop to read data continuously from the sensor.
-    Args:
-        sensor_ip (str): IP address of the sensor.
-        sensor_port (int): UDP port for the sensor communication.
-        force_torque_data (multiprocessing.Array): Shared memory array for force-torque data.
-        lock (multiprocessing.Lock): Lock for accessing shared memory.
-        stop_event (multiprocessing.Event): Event to stop the thread.
-    """
-    sensor_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sensor_socket.settimeout(1.0)  # Set timeout for socket operations
-
-    def send_command(command, sample_count=0):
-        """
-        Send a command to the sensor.
-
-        Args:
-            command (int): Command code.
-            sample_count (int): Number of samples to output (0 for continuous).
-        """
-        command_header = 0x1234
-        request = struct.pack('!HHI', command_header, command, sample_count)
-        sensor_socket.sendto(request, (sensor_ip, sensor_port))
-
-    send_command(command=0x0002, sample_count=0)  # Start continuous streaming
-
-    while not stop_event.is_set():
-        try:
-            data, _ = sensor_socket.recvfrom(1024)
 
-            if len(data) == 36:  # Minimum packet size
-                parsed_data = struct.unpack('!IIIiiiiii', data[:36])
-
-                rdt_sequence = parsed_data[0]
-                ft_sequence = parsed_data[1]
-                status = parsed_data[2]
-                Fx = parsed_data[3] / calpf
-                Fy = parsed_data[4] / calpf
-                Fz = parsed_data[5] / calpf
-                Tx = parsed_data[6] / calpt 
-                Ty = parsed_data[7] / calpt
-                Tz = parsed_data[8] / calpt
-                
-                with data_lock:
-                    force_torque_data[:] = [Fx, Fy, Fz, Tx, Ty, Tz]
-
-            else:
-                print(f"Warning: Unexpected packet size {len(data)}")
-
-        except socket.timeout:
-            print(f"WARNING: Timeout reading from sensor, retrying...")
-            send_command(command=0x0002, sample_count=0) # retry
-
-        except KeyboardInterrupt:
-            print(f"Stopping the force-torque sensor driver...")
-            break
-
-        except Exception as e:
-            print(f"Error in read loop: {e}")
-
-    send_command(command=0x0000)  # Stop streaming
-    sensor_socket.close()
+# RDT response header: rdt_sequence, ft_sequence, status
+_HEADER = struct.Struct('!III')
+# RDT response counts following the header: Fx, Fy, Fz, Tx, Ty, Tz
+_COUNTS = struct.Struct('!iiiiii')
+_PACKET_SIZE = _HEADER.size + _COUNTS.size
+# On Linux, recv with MSG_TRUNC reports the real datagram length, so oversize frames can be told apart.
+# Other platforms (e.g. macOS/BSD) define MSG_TRUNC but ignore it for recv, so an oversize frame there is
+# silently truncated to the buffer size and accepted.
+_MSG_TRUNC = socket.MSG_TRUNC if sys.platform.startswith('linux') else 0
+# Requested SO_RCVBUF for the sensor socket
+_RCVBUF_SIZE = 4 * 1024 * 1024
+# The receive buffer warning is printed once per process rather than on every start()
+_rcvbuf_warned = False
+# RDT request: command_header, command, sample_count
+_CMD = struct.Struct('!HHI')
+# The only requests the driver sends: start continuous streaming (command 0x0002) and stop (command 0x0000)
+_START_STREAMING = _CMD.pack(0x1234, 0x0002, 0)
+_STOP_STREAMING = _CMD.pack(0x1234, 0x0000, 0)
 
 
 class ForceTorqueSensorDriver:
-    def __init__(self, sensor_ip, sensor_port=49152):
+    def __init__(self, sensor_ip, sensor_port=49152, cpu=None, realtime_priority=None):
         """
         Initialize the force-torque sensor driver.
 
         Args:
             sensor_ip (str): IP address of the sensor.
             sensor_port (int): UDP port for the sensor communication.
+            cpu (int, optional): CPU core to pin the read thread to (Linux only). Defaults to None (no pinning).
+            realtime_priority (int, optional): SCHED_FIFO priority for the read thread (Linux only, usually
+                needs root or CAP_SYS_NICE). Defaults to None (normal scheduling).
         """
+        # Check the scheduling options here so mistakes reach the caller instead of the read thread
+        for name, value in (("cpu", cpu), ("realtime_priority", realtime_priority)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                raise TypeError(f"{name} must be an int or None, got {value!r}")
+        if cpu is not None and cpu < 0:
+            raise ValueError(f"cpu must be non-negative, got {cpu}")
+        if realtime_priority is not None and hasattr(os, "SCHED_FIFO"):
+            min_priority = os.sched_get_priority_min(os.SCHED_FIFO)
+            max_priority = os.sched_get_priority_max(os.SCHED_FIFO)
+            if not min_priority <= realtime_priority <= max_priority:
+                raise ValueError(f"realtime_priority must be between {min_priority} and {max_priority}, got {realtime_priority}")
+
         self.sensor_ip = sensor_ip
         self.sensor_port = sensor_port
+        self.cpu = cpu
+        self.realtime_priority = realtime_priority
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.settimeout(1.0)  # Set timeout for socket operations
+        self.session = requests.Session()  # Reuse the HTTP connection for the XML endpoints
 
         calibration = self.get_calibration_data()
 
@@ -93,10 +69,161 @@ class ForceTorqueSensorDriver:
         except (ValueError, TypeError):
             raise ValueError("Calibration data not available or invalid")
 
+        # Per-axis units per count, applied when a reading is requested rather than per packet
+        self._scale = (1.0 / self.calcpf,) * 3 + (1.0 / self.calcpt,) * 3
+
         self.thread = None
-        self.force_torque_data = multiprocessing.Array('d', [float('nan')] * 6)  # 'd' means double (float)
-        self.data_lock = multiprocessing.Lock()
-        self.stop_event = multiprocessing.Event()
+        self.force_torque_counts = bytearray(_COUNTS.size)  # counts of the latest packet, as received
+        self.seq = 0  # incremented before and after each write to force_torque_counts, odd while writing
+        self.stop_conn = None
+        self.first_reading_event = threading.Event()
+        self.read_loop_error = None  # set by the read thread if it fails to start
+
+    def _send_command(self, sensor_socket, request):
+        """
+        Send a command to the sensor.
+
+        Args:
+            sensor_socket (socket.socket): UDP socket used to talk to the sensor.
+            request (bytes): Packed RDT request, e.g. _START_STREAMING or _STOP_STREAMING.
+        """
+        sensor_socket.sendto(request, (self.sensor_ip, self.sensor_port))
+
+    def _open_sensor_socket(self, stop_reader):
+        """
+        Prepare the read thread: apply scheduling options, open the sensor socket and selector and
+        start streaming.
+
+        Args:
+            stop_reader (socket.socket): Socket that becomes readable to stop the thread.
+
+        Returns:
+            tuple: (sensor_socket, selector)
+        """
+        global _rcvbuf_warned
+
+        # On Linux pid 0 refers to the calling thread, so only the read thread is affected
+        if self.cpu is not None:
+            try:
+                os.sched_setaffinity(0, {self.cpu})
+            except (AttributeError, OSError, ValueError, OverflowError) as e:
+                print(f"Warning: Could not pin read thread to CPU {self.cpu}: {e}")
+
+        if self.realtime_priority is not None:
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.realtime_priority))
+            except (AttributeError, OSError, ValueError, OverflowError) as e:
+                print(f"Warning: Could not set real-time priority for read thread: {e}")
+
+        sensor_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        selector = None
+        try:
+            sensor_socket.setblocking(False)
+            # Absorb short stalls of the loop (GC, GIL) without dropping packets. Each queued datagram is charged
+            # its full kernel buffer size rather than 36 bytes, so even 4 MiB holds well under a second at 7 kHz.
+            # Linux silently caps the request at net.core.rmem_max (about 208 KiB on stock kernels), other
+            # platforms (e.g. FreeBSD above kern.ipc.maxsockbuf) reject it, in which case the default is kept.
+            try:
+                sensor_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RCVBUF_SIZE)
+                rcvbuf_size = sensor_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+                if rcvbuf_size < _RCVBUF_SIZE and not _rcvbuf_warned:  # Linux reports double the usable size
+                    print(f"Warning: Socket receive buffer capped by the kernel ({rcvbuf_size} bytes, requested {_RCVBUF_SIZE}), "
+                          f"raise net.core.rmem_max to allow more")
+                    _rcvbuf_warned = True
+            except OSError as e:
+                if not _rcvbuf_warned:
+                    print(f"Warning: Could not enlarge socket receive buffer: {e}")
+                    _rcvbuf_warned = True
+
+            # Wait on both the sensor and the stop socket so stop() is observed immediately
+            selector = selectors.DefaultSelector()
+            selector.register(sensor_socket, selectors.EVENT_READ)
+            selector.register(stop_reader, selectors.EVENT_READ)
+
+            self._send_command(sensor_socket, _START_STREAMING)  # Start continuous streaming
+        except BaseException:
+            if selector is not None:
+                selector.close()
+            sensor_socket.close()
+            raise
+
+        return sensor_socket, selector
+
+    def _read_loop(self, stop_reader):
+        """
+        Thread loop to read data continuously from the sensor.
+
+        Args:
+            stop_reader (socket.socket): Socket that becomes readable to stop the thread.
+        """
+        try:
+            try:
+                sensor_socket, selector = self._open_sensor_socket(stop_reader)
+            except Exception as e:
+                # Hand the error to start(), which wakes up on first_reading_event and re-raises it
+                self.read_loop_error = e
+                self.first_reading_event.set()
+                return
+
+            try:
+                self._stream(sensor_socket, selector, stop_reader)
+            finally:
+                selector.close()
+                sensor_socket.close()
+        finally:
+            stop_reader.close()
+
+    def _stream(self, sensor_socket, selector, stop_reader):
+        """
+        Stream packets from the sensor until the stop socket becomes readable.
+
+        Args:
+            sensor_socket (socket.socket): UDP socket used to talk to the sensor.
+            selector (selectors.BaseSelector): Selector watching sensor_socket and stop_reader.
+            stop_reader (socket.socket): Socket that becomes readable to stop the thread.
+        """
+        first_reading = True
+        force_torque_counts = self.force_torque_counts
+        packet_buffer = bytearray(_PACKET_SIZE)  # reused for every packet to avoid per-packet allocations
+        packet_counts = memoryview(packet_buffer)[_HEADER.size:_PACKET_SIZE]
+        seq = self.seq
+        running = True
+
+        while running:
+            try:
+                events = selector.select(timeout=1.0)
+
+                if not events:
+                    print(f"WARNING: Timeout reading from sensor, retrying...")
+                    self._send_command(sensor_socket, _START_STREAMING) # retry
+                    continue
+
+                for key, _ in events:
+                    if key.fileobj is stop_reader:
+                        running = False
+                        break
+
+                    # RDT only sends 36-byte frames, anything else is discarded (oversize frames only on Linux)
+                    packet_size = sensor_socket.recv_into(packet_buffer, _PACKET_SIZE, _MSG_TRUNC)
+                    if packet_size != _PACKET_SIZE:
+                        continue
+
+                    # Keep the counts as raw bytes, they are only decoded when a reading is requested
+                    seq += 1
+                    self.seq = seq
+                    force_torque_counts[:] = packet_counts
+                    seq += 1
+                    self.seq = seq
+
+                    if first_reading:
+                        self.first_reading_event.set()
+                        first_reading = False
+
+            except Exception as e:
+                print(f"Error in read loop: {e}")
+
+        self._send_command(sensor_socket, _STOP_STREAMING)  # Stop streaming
+        packet_counts.release()
 
     def start(self, timeout=3.0):
         """
@@ -108,48 +235,87 @@ class ForceTorqueSensorDriver:
             raise RuntimeError("Sensor driver is already running")
 
         # clear the latest reading and event
-        with self.data_lock:
-            self.force_torque_data[:] = [float('nan')] * 6
+        self.force_torque_counts[:] = bytes(_COUNTS.size)
+
+        self.first_reading_event.clear()
+        self.read_loop_error = None
 
-        self.stop_event.clear()
+        # The read loop exits as soon as a byte is written to this socket pair
+        stop_reader, self.stop_conn = socket.socketpair()
 
-        self.thread = multiprocessing.Process(
-            target=read_loop,
-            args=(self.sensor_ip, self.sensor_port, self.calcpf, self.calcpt, self.force_torque_data, self.data_lock, self.stop_event)
-        )
+        self.thread = threading.Thread(target=self._read_loop, args=(stop_reader,), daemon=True)
         self.thread.start()
 
         # Block until the first reading is available
-        start_time = time.time()
-        while True:
-
-            with self.data_lock:
-                if self.force_torque_data[0] != float('nan'):
-                    break
+        if not self.first_reading_event.wait(timeout):
+            raise TimeoutError("Timeout waiting for first reading")
 
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timeout waiting for first reading")
-            
-            time.sleep(1/50)  # 50 Hz
+        # The read thread could not start, clean up and report why
+        if self.read_loop_error is not None:
+            error = self.read_loop_error
+            self.stop()
+            raise error
 
     def stop(self):
         """
-        Stop the data acquisition thread.
+        Stop the data acquisition thread. Does nothing if the driver is not running.
         """
-        self.stop_event.set()
+        if self.stop_conn is None:
+            return
+
+        try:
+            self.stop_conn.send(b'\0')
+        except OSError:
+            pass  # the read thread already exited and closed its end
         self.thread.join()
+        self.stop_conn.close()
+        self.stop_conn = None
+        self.first_reading_event.clear()
 
         # Clear the latest reading
-        with self.data_lock:
-            self.force_torque_data[:] = [float('nan')] * 6
+        self.force_torque_counts[:] = bytes(_COUNTS.size)
+
+    def get_wrench(self, out=None):
+        """
+        Get the latest wrench reading.
 
-    def get_wrench(self):
+        Args:
+            out (list, optional): Preallocated 6-element sequence (e.g. a list or numpy array) to write
+                the reading into, avoiding a new list per call. The same object is returned and is
+                overwritten on the next call, so copy it if the values need to be kept.
+
+        Returns:
+            list: [Fx, Fy, Fz, Tx, Ty, Tz], or `out` if given.
+        """
         # check if the thread is running
         if self.thread is None or not self.thread.is_alive():
             raise RuntimeError("Sensor driver is not running")
-        
-        with self.data_lock:
-            return list(self.force_torque_data)
+
+        if out is None:
+            out = [0.0] * 6
+
+        # No packet received yet
+        if not self.first_reading_event.is_set():
+            out[:] = [float('nan')] * 6
+            return out
+
+        # Seqlock read: retry if the read thread was mid-update or updated while copying
+        while True:
+            seq = self.seq
+            if not seq & 1:
+                counts = _COUNTS.unpack_from(self.force_torque_counts)
+                if self.seq == seq:
+                    break
+            time.sleep(0)  # yield so the read thread can finish its update
+
+        scale = self._scale
+        out[0] = counts[0] * scale[0]
+        out[1] = counts[1] * scale[1]
+        out[2] = counts[2] * scale[2]
+        out[3] = counts[3] * scale[3]
+        out[4] = counts[4] * scale[4]
+        out[5] = counts[5] * scale[5]
+        return out
 
     def get_sensor_configuration(self):
         """
@@ -160,7 +326,7 @@ class ForceTorqueSensorDriver:
         """
         url = f"http://{self.sensor_ip}/netftapi2.xml"
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             root = ET.fromstring(response.content)
             config = {child.tag: child.text for child in root}
@@ -183,7 +349,7 @@ class ForceTorqueSensorDriver:
         if index is not None:
             url += f"?index={index}"
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             root = ET.fromstring(response.content)
             calibration = {child.tag: child.text for child in root}
@@ -10,12 +10,9 @@ wrench_data = np.zeros((num_points, 6))
 def update_plot(frame):
     global wrench_data
 
-    # Get latest wrench data
-    wrench = driver.get_wrench()
-    
-    # Shift data to the left and append new data
+    # Shift data to the left and write the latest wrench data into the last row
     wrench_data[:-1] = wrench_data[1:]
-    wrench_data[-1] = wrench
+    driver.get_wrench(out=wrench_data[-1])
 
     # Update plot data for each axis
     for i, line in enumerate(lines):